@@ -1,13 +1,28 @@
 import os
-import json
-import uuid
+import atexit
+import re
+import time
+import secrets
+import hashlib
 import logging
-from datetime import datetime, timedelta
-from threading import Timer
-from flask import Flask, render_template, request, jsonify, session
+import queue
+from bisect import bisect_right
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from threading import Event, Thread, Lock, RLock
+from concurrent.futures import ThreadPoolExecutor
+from flask import Flask, Response, render_template, request, jsonify, session, stream_with_context
+from flask.json.provider import JSONProvider
 from dotenv import load_dotenv
+from cachetools import TTLCache, cached
+import orjson
+import msgspec
 import google.generativeai as genai
 
+# 환경 변수 로드 (database가 import 시점에 DB_PATH를 읽으므로 먼저 실행)
+load_dotenv()
+
 # 데이터베이스 모듈 import
 import database as db
 
@@ -15,9 +30,15 @@ import database as db
 from prompts import (
     SCENARIO_GENERATION_PROMPT,
     DEFAULT_SCENARIO,
+    ScenarioSchema,
+    EvaluationSchema,
+    HintBatchSchema,
     format_question_evaluation_prompt,
-    format_npc_response_prompt,
+    format_npc_system_prompt,
+    format_npc_turn_prompt,
     format_hint_generation_prompt,
+    format_hint_batch_generation_prompt,
+    format_history_entry,
     build_conversation_history
 )
 
@@ -25,61 +46,143 @@ from prompts import (
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# 환경 변수 로드
-load_dotenv()
+class OrjsonProvider(JSONProvider):
+    """orjson 기반 JSON 처리 (jsonify, request.json)"""
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
 
 # Flask 앱 초기화
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 app.secret_key = os.getenv('FLASK_SECRET_KEY', 'dev-secret-key-change-in-production')
 
 # 게임 설정 상수
 MAX_QUESTIONS = 50  # 최대 질문 횟수
 MAX_HINTS = 3  # 최대 힌트 횟수
+HISTORY_MAX_ITEMS = 5  # NPC 프롬프트에 포함할 최근 대화 수
+DUPLICATE_QUESTION_WINDOW = 10  # 같은 질문을 중복 전송으로 간주하는 시간 (초)
 GAME_CLEANUP_INTERVAL = 600  # 정리 간격 (초) - 10분
 GAME_RETENTION_TIME = 3600  # 게임 보관 시간 (초) - 1시간
+DB_MAINTENANCE_EVERY = 6  # DB 정리 주기 (정리 작업 횟수 기준) - 1시간
+GRADE_THRESHOLDS = [60, 70, 80, 90]  # 등급 기준 점수 (오름차순)
+GRADES = 'DCBAS'  # GRADE_THRESHOLDS 구간별 등급 (60 미만 D ... 90 이상 S)
+MAX_ACTIVE_GAMES = 10000  # 인메모리 최대 게임 세션 수
+WORKER_CONNECTIONS = int(os.getenv('WORKER_CONNECTIONS', '1000'))  # gunicorn 워커의 동시 연결 수 (start.sh와 공유)
+LLM_MAX_WORKERS = WORKER_CONNECTIONS  # Gemini 동시 호출 수 (연결마다 평가가 대기열에 밀리지 않도록 연결 수만큼)
+EVAL_CACHE_SIZE = 4096  # 질문 평가 캐시 최대 항목 수
+MIN_EVAL_QUESTION_LENGTH = 5  # 이보다 짧은 질문은 LLM 평가 없이 낮은 점수 부여 (앞뒤 공백 제외)
+QUESTION_WRITE_BATCH = 64  # 질문 기록을 DB에 한 번에 저장할 최대 개수
+STATS_CACHE_TTL = 30  # 통계 응답 캐시 시간 (초)
+MAX_LEADERBOARD_LIMIT = 100  # 리더보드 조회 최대 인원
 
 # Gemini API 설정
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
 if not GEMINI_API_KEY:
     raise ValueError("GEMINI_API_KEY가 설정되지 않았습니다. .env 파일을 확인하세요.")
 
-genai.configure(api_key=GEMINI_API_KEY)
+# gRPC 대신 REST 전송 사용 (gevent 워커에서 협조적으로 동작하며 HTTP 연결을 재사용)
+genai.configure(api_key=GEMINI_API_KEY, transport='rest')
+
+@dataclass(slots=True)
+class GameSession:
+    """인메모리 게임 세션 상태"""
+    session_id: str
+    scenario: dict
+    scenario_date: str
+    culprit: str
+    npcs: list
+    npc_by_name: dict
+    npc_models: dict  # NPC별 모델 (NPC 설정을 system_instruction으로 고정, 게임 동안 재사용)
+    scenario_context: str  # 질문 평가용 사건 요약
+    hint_prompt: str  # 힌트 생성 프롬프트 (시나리오와 범인이 고정이므로 한 번만 생성)
+    questions: list = field(default_factory=list)  # {npc_name, question, answer, quality_score, reasoning, ts}
+    history_tail: deque = field(default_factory=lambda: deque(maxlen=HISTORY_MAX_ITEMS))  # 최근 대화 (format_history_entry)
+    hints_used: int = 0  # 사용한 힌트 횟수
+    quality_sum: int = 0  # 질문 품질 점수 합계 (힌트는 0점으로 포함)
+    quality_n: int = 0  # 품질 점수가 매겨진 기록 수
+    start_time: str = field(default_factory=lambda: datetime.now().isoformat())
+    is_finished: bool = False
+    end_time: str | None = None
+    final_score: dict | None = None
+    lock: Lock = field(default_factory=Lock)  # 세션 단위 요청 직렬화
 
-# 게임 세션 저장소 (활성 세션만 인메모리)
-games = {}
+# 게임 세션 저장소 (활성 세션만 인메모리, 마지막 활동 후 보관 시간이 지나면 자동 만료)
+# TTLCache는 스레드 안전하지 않으므로 조회/변경 시 games_lock을 사용
+games = TTLCache(maxsize=MAX_ACTIVE_GAMES, ttl=GAME_RETENTION_TIME)
+games_lock = RLock()
 
 # Gemini 모델 설정
-model = genai.GenerativeModel('gemini-2.5-flash')
+GEMINI_MODEL = 'gemini-2.5-flash'
+model = genai.GenerativeModel(GEMINI_MODEL)
+
+# 독립적인 Gemini 호출을 병렬로 처리하기 위한 공용 스레드 풀
+# gevent 워커에서는 threading이 패치되어 작업 스레드가 greenlet이 되므로 크게 잡아도 부담이 적고,
+# 스레드는 필요할 때만 생성됩니다.
+EXECUTOR = ThreadPoolExecutor(max_workers=LLM_MAX_WORKERS)
+
+# JSON 응답 모드 설정 (코드 블록 없이 스키마에 맞는 JSON만 반환)
+SCENARIO_GENERATION_CONFIG = {
+    'response_mime_type': 'application/json',
+    'response_schema': ScenarioSchema
+}
+EVALUATION_GENERATION_CONFIG = {
+    'response_mime_type': 'application/json',
+    'response_schema': EvaluationSchema
+}
+HINT_BATCH_GENERATION_CONFIG = {
+    'response_mime_type': 'application/json',
+    'response_schema': HintBatchSchema
+}
+
+# JSON 모드가 무시된 경우를 위한 마크다운 코드 블록 표시 패턴
+_CODE_FENCE_RE = re.compile(r'^\s*```(?:json)?\s*(.*?)\s*```\s*$', re.DOTALL)
+
+# 질문 평가 캐시 키에서 무시할 문자 (공백, 문장부호)
+_QUESTION_NOISE_RE = re.compile(r'[\W_]+')
+
+# LLM 응답 스키마 디코더 (JSON을 검증하며 바로 dict로 변환)
+SCENARIO_DECODER = msgspec.json.Decoder(ScenarioSchema)
+EVALUATION_DECODER = msgspec.json.Decoder(EvaluationSchema, strict=False)
+HINT_BATCH_DECODER = msgspec.json.Decoder(HintBatchSchema)
+
+# 질문 평가 결과 캐시 (LRU): (정규화된 질문, 시나리오 해시) -> 평가 결과
+_eval_cache = OrderedDict()
+_eval_cache_lock = Lock()
+
+# 일일 시나리오 캐시: 날짜 -> (시나리오, 클라이언트용 공개 시나리오)
+_daily_cache = {}
+_daily_cache_lock = Lock()
+
+# 시나리오별 힌트 묶음: 시나리오 날짜 -> Future(힌트 목록)
+_hint_pools = {}
+_hint_pools_lock = Lock()
 
 # 데이터베이스 초기화
 db.init_db()
 
-def cleanup_old_games():
-    """오래된 게임 세션 및 DB 데이터를 정리합니다."""
+def cleanup_old_games(run_db_maintenance=True):
+    """오래된 게임 세션 및 DB 데이터를 정리합니다.
+    
+    DB 삭제는 파일 단편화를 줄이기 위해 run_db_maintenance일 때만 모아서 실행합니다.
+    """
     try:
-        now = datetime.now()
-        to_delete = []
-        
-        # 인메모리 게임 세션 정리
-        for session_id, game in games.items():
-            if game.get('is_finished'):
-                end_time_str = game.get('end_time', game.get('start_time'))
-                if end_time_str:
-                    try:
-                        end_time = datetime.fromisoformat(end_time_str)
-                        if (now - end_time).total_seconds() > GAME_RETENTION_TIME:
-                            to_delete.append(session_id)
-                    except (ValueError, TypeError) as e:
-                        logger.warning(f"게임 세션 {session_id}의 시간 파싱 실패: {e}")
-        
-        for session_id in to_delete:
-            del games[session_id]
-            logger.info(f"인메모리 게임 세션 {session_id} 정리 완료")
-        
-        if to_delete:
-            logger.info(f"{len(to_delete)}개의 활성 세션을 정리했습니다. 현재 활성 세션: {len(games)}개")
-        
-        # DB 오래된 세션 정리 (24시간 이상 된 완료 세션)
+        # 인메모리 게임 세션은 TTLCache가 만료시키므로 만료 항목만 즉시 비움
+        with games_lock:
+            before_count = len(games)
+            games.expire()
+            active_count = len(games)
+        
+        if before_count > active_count:
+            logger.info(f"{before_count - active_count}개의 만료된 세션을 정리했습니다. 현재 활성 세션: {active_count}개")
+        
+        if not run_db_maintenance:
+            return
+        
+        # DB 오래된 세션 정리 (24시간 이상 된 완료 세션, 24시간 전에 시작해 끝나지 않은 세션)
         deleted_sessions = db.delete_old_sessions(hours=24)
         if deleted_sessions > 0:
             logger.info(f"DB에서 {deleted_sessions}개의 오래된 세션 삭제")
@@ -89,33 +192,146 @@ def cleanup_old_games():
         if deleted_scenarios > 0:
             logger.info(f"DB에서 {deleted_scenarios}개의 오래된 시나리오 삭제")
         
+        # 삭제로 생긴 빈 페이지 반환
+        if deleted_sessions or deleted_scenarios:
+            db.incremental_vacuum()
+        
     except Exception as e:
         logger.error(f"게임 세션 정리 중 오류: {e}", exc_info=True)
-    finally:
-        # 다음 정리 스케줄
-        Timer(GAME_CLEANUP_INTERVAL, cleanup_old_games).start()
+
+# 백그라운드 작업 종료 신호
+_shutdown = Event()
+atexit.register(_shutdown.set)
+
+def _cleanup_loop():
+    """정리 작업을 주기적으로 실행하는 단일 백그라운드 루프입니다."""
+    tick = 0
+    while True:
+        cleanup_old_games(run_db_maintenance=tick % DB_MAINTENANCE_EVERY == 0)
+        tick += 1
+        if _shutdown.wait(GAME_CLEANUP_INTERVAL):
+            break
 
 # 앱 시작 시 정리 작업 시작
-cleanup_old_games()
+Thread(target=_cleanup_loop, daemon=True).start()
+
+# DB 쓰기 대기열 (요청 처리 중에는 넣기만 하고 별도 스레드가 모아서 저장)
+# 항목: ('question', 질문 행 튜플) 또는 ('finish', session_id, finish_game_session 인자)
+_db_write_queue = queue.Queue()
+
+def _drain_db_write_queue(batch):
+    """대기 중인 쓰기 항목을 batch에 최대 QUESTION_WRITE_BATCH개까지 옮깁니다."""
+    while len(batch) < QUESTION_WRITE_BATCH:
+        try:
+            batch.append(_db_write_queue.get_nowait())
+        except queue.Empty:
+            break
+    return batch
 
-def get_daily_scenario():
-    """일일 시나리오를 가져옵니다. DB에 없으면 새로 생성합니다."""
-    today = datetime.now().date().isoformat()
+def _write_batch(batch):
+    """쓰기 항목을 저장합니다. 종료된 세션은 남은 질문과 결과를 한 트랜잭션으로 저장합니다."""
+    finishes = [item for item in batch if item[0] == 'finish']
+    finished_ids = {item[1] for item in finishes}
     
-    # DB에서 오늘 시나리오 조회
-    scenario = db.get_daily_scenario(today)
-    if scenario:
-        logger.info(f"DB에서 일일 시나리오 로드: {today}")
-        return scenario
+    pending = {}  # 종료된 세션의 아직 저장되지 않은 질문
+    rows = []  # 나머지 질문
+    for item in batch:
+        if item[0] == 'question':
+            session_id = item[1][0]
+            if session_id in finished_ids:
+                pending.setdefault(session_id, []).append(item[1])
+            else:
+                rows.append(item[1])
     
-    # 없으면 새로 생성
-    logger.info(f"새로운 일일 시나리오 생성: {today}")
-    scenario = generate_scenario()
+    if rows:
+        db.save_questions_bulk(rows)
+    for _, session_id, finish_args in finishes:
+        db.finalize_session(session_id, pending.get(session_id, []), **finish_args)
+    if finishes:
+        # 결과가 저장된 뒤에 통계 캐시를 비워야 이전 값이 다시 캐시되지 않음
+        invalidate_stats_cache()
+
+def _db_writer_loop():
+    """DB 쓰기를 모아서 처리하는 단일 백그라운드 루프입니다."""
+    while True:
+        batch = _drain_db_write_queue([_db_write_queue.get()])
+        try:
+            _write_batch(batch)
+        except Exception as e:
+            logger.error(f"DB 쓰기 처리 중 오류: {e}", exc_info=True)
+
+def _flush_db_write_queue():
+    """종료 시 아직 저장되지 않은 쓰기 항목을 저장합니다."""
+    while True:
+        batch = _drain_db_write_queue([])
+        if not batch:
+            break
+        _write_batch(batch)
+
+Thread(target=_db_writer_loop, daemon=True).start()
+atexit.register(_flush_db_write_queue)
+
+def get_game(session_id, refresh=False):
+    """인메모리 게임 세션을 조회합니다. 없거나 만료되었으면 None을 반환합니다.
+    
+    refresh이면 항목을 다시 넣어 TTL을 초기화합니다 (만료 시간을 마지막 활동 기준으로 계산).
+    """
+    with games_lock:
+        game = games.get(session_id)
+        if refresh and game is not None:
+            games[session_id] = game
+        return game
+
+def build_public_scenario(scenario):
+    """클라이언트에 전달할 시나리오 정보를 만듭니다 (범인, NPC 비밀 정보 제외)."""
+    return {
+        'title': scenario['title'],
+        'scenario': scenario['scenario'],
+        'victim': scenario['victim'],
+        'location': scenario['location'],
+        'time': scenario['time'],
+        'npcs': [
+            {
+                'name': npc['name'],
+                'role': npc['role'],
+                'personality': npc['personality'],
+                'relationship': npc['relationship']
+            }
+            for npc in scenario['npcs']
+        ],
+        'key_evidence': scenario.get('key_evidence', [])
+    }
+
+
+def get_daily_scenario(today=None):
+    """일일 시나리오를 가져옵니다. DB에 없으면 새로 생성합니다.
     
-    # DB에 저장
-    db.save_daily_scenario(today, scenario)
+    (시나리오, 공개 시나리오)를 반환하며, 결과는 날짜별로 프로세스 내에 캐시됩니다.
+    """
+    if today is None:
+        today = datetime.now().date().isoformat()
     
-    return scenario
+    with _daily_cache_lock:
+        cached = _daily_cache.get(today)
+        if cached:
+            return cached
+        
+        # DB에서 오늘 시나리오 조회
+        scenario = db.get_daily_scenario(today)
+        if scenario:
+            logger.info(f"DB에서 일일 시나리오 로드: {today}")
+        else:
+            # 없으면 새로 생성
+            logger.info(f"새로운 일일 시나리오 생성: {today}")
+            scenario = generate_scenario()
+            
+            # DB에 저장
+            db.save_daily_scenario(today, scenario)
+        
+        # 날짜가 바뀌면 이전 날짜 항목은 버림
+        _daily_cache.clear()
+        _daily_cache[today] = (scenario, build_public_scenario(scenario))
+        return _daily_cache[today]
 
 
 def generate_scenario():
@@ -123,20 +339,12 @@ def generate_scenario():
     max_retries = 3
     for attempt in range(max_retries):
         try:
-            response = model.generate_content(SCENARIO_GENERATION_PROMPT)
+            response = model.generate_content(
+                SCENARIO_GENERATION_PROMPT,
+                generation_config=SCENARIO_GENERATION_CONFIG
+            )
             # JSON 파싱
-            text = response.text.strip()
-            
-            # 마크다운 코드 블록 제거
-            if text.startswith('```json'):
-                text = text[7:]
-            elif text.startswith('```'):
-                text = text[3:]
-            if text.endswith('```'):
-                text = text[:-3]
-            
-            text = text.strip()
-            scenario_data = json.loads(text)
+            scenario_data = _parse_llm_json(response.text, SCENARIO_DECODER)
             
             # 범인이 NPC 목록에 있는지 확인
             npc_names = [npc['name'] for npc in scenario_data['npcs']]
@@ -144,67 +352,178 @@ def generate_scenario():
                 # 범인이 NPC 목록에 없으면 첫 번째 NPC를 범인으로 설정
                 scenario_data['culprit'] = npc_names[0]
             
-            logging.info(f"시나리오 생성 성공 (시도 {attempt + 1}/{max_retries})")
+            logger.info(f"시나리오 생성 성공 (시도 {attempt + 1}/{max_retries})")
             return scenario_data
             
-        except json.JSONDecodeError as e:
-            logging.warning(f"시나리오 JSON 파싱 실패 (시도 {attempt + 1}/{max_retries}): {str(e)}")
+        except msgspec.DecodeError as e:
+            logger.warning(f"시나리오 JSON 파싱 실패 (시도 {attempt + 1}/{max_retries}): {str(e)}")
             if attempt == max_retries - 1:
-                logging.error("시나리오 생성 최대 재시도 횟수 초과, 기본 시나리오 사용")
+                logger.error("시나리오 생성 최대 재시도 횟수 초과, 기본 시나리오 사용")
             continue
         except Exception as e:
-            logging.error(f"시나리오 생성 오류 (시도 {attempt + 1}/{max_retries}): {str(e)}")
+            logger.error(f"시나리오 생성 오류 (시도 {attempt + 1}/{max_retries}): {str(e)}", exc_info=True)
             if attempt == max_retries - 1:
-                logging.error("시나리오 생성 실패, 기본 시나리오 사용")
+                logger.error("시나리오 생성 실패, 기본 시나리오 사용")
             continue
     
     # 모든 재시도 실패 시 기본 시나리오 반환
-    logging.warning("기본 시나리오 사용")
+    logger.warning("기본 시나리오 사용")
     return DEFAULT_SCENARIO
 
+def _parse_llm_json(text, decoder):
+    """LLM 응답 텍스트를 디코더로 파싱합니다.
+    
+    JSON 모드 응답을 먼저 그대로 디코딩하고, 실패하면 마크다운 코드 블록을
+    벗겨낸 뒤 한 번 더 시도합니다. 두 번 모두 실패하면 msgspec.DecodeError를 발생시킵니다.
+    """
+    try:
+        return decoder.decode(text)
+    except msgspec.DecodeError:
+        match = _CODE_FENCE_RE.match(text)
+        if not match:
+            raise
+        return decoder.decode(match.group(1))
+
+def prepare_scenario(date):
+    """해당 날짜의 시나리오가 DB에 없으면 미리 생성해 저장합니다 (일일 캐시는 건드리지 않음)."""
+    if db.get_daily_scenario(date):
+        return
+    logger.info(f"시나리오 사전 생성: {date}")
+    db.save_daily_scenario(date, generate_scenario())
+
+def prewarm_daily_scenario():
+    """오늘과 내일의 시나리오를 미리 준비하여 /start 요청이 생성을 기다리지 않게 합니다.
+    
+    날짜가 바뀌는 시점에도 바로 사용할 수 있도록 정리 주기마다 내일 시나리오를 확인합니다.
+    """
+    while True:
+        try:
+            get_daily_scenario()
+            tomorrow = (datetime.now().date() + timedelta(days=1)).isoformat()
+            prepare_scenario(tomorrow)
+        except Exception as e:
+            logger.error(f"일일 시나리오 사전 준비 중 오류: {e}", exc_info=True)
+        if _shutdown.wait(GAME_CLEANUP_INTERVAL):
+            break
+
+# 앱 시작 시 백그라운드에서 오늘/내일 시나리오 준비
+Thread(target=prewarm_daily_scenario, daemon=True).start()
+
+def generate_hint_pool(scenario):
+    """한 번의 LLM 호출로 게임에서 사용할 힌트 MAX_HINTS개를 생성합니다."""
+    prompt = format_hint_batch_generation_prompt(scenario['scenario'], scenario['culprit'], MAX_HINTS)
+    response = model.generate_content(
+        prompt,
+        generation_config=HINT_BATCH_GENERATION_CONFIG
+    )
+    result = _parse_llm_json(response.text, HINT_BATCH_DECODER)
+    return [hint.strip() for hint in result['hints'] if hint.strip()]
+
+def get_hint_pool(scenario_date, scenario):
+    """시나리오의 힌트 묶음 Future를 반환합니다. 없으면 백그라운드에서 생성을 시작합니다.
+    
+    힌트는 시나리오와 범인에만 의존하므로 같은 날짜의 게임들이 한 묶음을 공유합니다.
+    """
+    with _hint_pools_lock:
+        future = _hint_pools.get(scenario_date)
+        if future is None:
+            # 이전 날짜 게임이 남아 있을 수 있으므로 최근 두 날짜만 보관
+            while len(_hint_pools) >= 2:
+                _hint_pools.pop(next(iter(_hint_pools)))
+            future = EXECUTOR.submit(generate_hint_pool, scenario)
+            _hint_pools[scenario_date] = future
+        return future
+
+def take_hint(game):
+    """게임의 다음 힌트를 반환합니다. 미리 생성한 힌트 묶음을 우선 사용합니다."""
+    future = get_hint_pool(game.scenario_date, game.scenario)
+    try:
+        pool = future.result()
+        if game.hints_used < len(pool):
+            return pool[game.hints_used]
+    except Exception as e:
+        logger.warning(f"힌트 묶음 생성 실패, 개별 생성으로 대체: {e}")
+        # 다음 요청에서 다시 생성하도록 실패한 묶음 제거
+        with _hint_pools_lock:
+            if _hint_pools.get(game.scenario_date) is future:
+                del _hint_pools[game.scenario_date]
+    
+    # 묶음이 없거나 부족하면 개별 생성 (게임 시작 시 만든 프롬프트 재사용)
+    response = model.generate_content(game.hint_prompt)
+    return response.text.strip()
+
+def _eval_cache_key(question, scenario_context):
+    """질문 평가 캐시 키를 생성합니다. 대소문자, 공백, 문장부호만 다른 질문은 같은 키가 됩니다."""
+    normalized = _QUESTION_NOISE_RE.sub(' ', question).strip().casefold()
+    context_hash = hashlib.blake2b(scenario_context.encode(), digest_size=8).hexdigest()
+    return (normalized, context_hash)
+
 def evaluate_question_quality(question, scenario_context):
-    """질문의 품질을 1-100점으로 평가합니다."""
+    """질문의 품질을 1-100점으로 평가합니다. 같은 사건의 동일한 질문은 캐시된 결과를 사용합니다."""
+    cache_key = _eval_cache_key(question, scenario_context)
+    
+    # 너무 짧거나 글자가 없는 질문은 LLM 호출 없이 처리
+    stripped = question.strip()
+    if len(stripped) < MIN_EVAL_QUESTION_LENGTH or not any(c.isalpha() for c in stripped):
+        return {'score': 10, 'reasoning': '질문이 너무 짧거나 구체적이지 않습니다'}
+    
+    with _eval_cache_lock:
+        cached = _eval_cache.get(cache_key)
+        if cached is not None:
+            _eval_cache.move_to_end(cache_key)
+            return cached
+    
     prompt = format_question_evaluation_prompt(question, scenario_context)
     
     try:
-        response = model.generate_content(prompt)
-        text = response.text.strip()
+        response = model.generate_content(
+            prompt,
+            generation_config=EVALUATION_GENERATION_CONFIG
+        )
         
         # JSON 파싱
-        if text.startswith('```json'):
-            text = text[7:]
-        elif text.startswith('```'):
-            text = text[3:]
-        if text.endswith('```'):
-            text = text[:-3]
-        
-        text = text.strip()
-        result = json.loads(text)
+        result = _parse_llm_json(response.text, EVALUATION_DECODER)
         
         # 점수가 1-100 범위 내에 있는지 확인
         score = max(1, min(100, result.get('score', 50)))
-        return {
+        evaluation = {
             'score': score,
             'reasoning': result.get('reasoning', '평가 완료')
         }
-    except Exception as e:
-        print(f"질문 평가 오류: {e}")
+    except Exception:
+        logger.exception("질문 평가 오류")
+        # 오류 결과는 캐시하지 않음
         return {'score': 50, 'reasoning': '평가 중 오류 발생'}
+    
+    with _eval_cache_lock:
+        _eval_cache[cache_key] = evaluation
+        if len(_eval_cache) > EVAL_CACHE_SIZE:
+            _eval_cache.popitem(last=False)
+    return evaluation
 
-def generate_npc_response(question, npc_info, scenario, previous_questions):
-    """NPC의 응답을 생성합니다. NPC는 자신의 비밀을 숨기려고 합니다."""
+def stream_npc_response(question, npc_model, history_entries):
+    """NPC의 응답을 스트리밍으로 생성합니다. NPC는 자신의 비밀을 숨기려고 합니다.
     
-    # 이전 대화 컨텍스트 구성
-    conversation_history = build_conversation_history(previous_questions, max_items=5)
+    생성되는 텍스트 조각을 도착하는 대로 반환합니다. npc_model은 NPC 설정을
+    system_instruction으로 가진 모델이므로 매 턴에는 최근 대화와 질문만 전송합니다.
+    """
     
-    prompt = format_npc_response_prompt(question, npc_info, scenario, conversation_history)
+    # 이전 대화 컨텍스트 구성 (미리 포맷된 최근 항목을 합치기만 함)
+    conversation_history = build_conversation_history(history_entries)
     
+    turn_prompt = format_npc_turn_prompt(question, conversation_history)
+    
+    has_output = False
     try:
-        response = model.generate_content(prompt)
-        return response.text.strip()
-    except Exception as e:
-        print(f"NPC 응답 생성 오류: {e}")
-        return "죄송합니다. 지금은 대답하기 어렵습니다."
+        for chunk in npc_model.generate_content(turn_prompt, stream=True):
+            if chunk.text:
+                has_output = True
+                yield chunk.text
+    except Exception:
+        logger.exception("NPC 응답 생성 오류")
+        # 응답 도중 끊긴 경우에는 받은 부분까지만 사용
+        if not has_output:
+            yield "죄송합니다. 지금은 대답하기 어렵습니다."
 
 def calculate_final_score(question_count, avg_quality_score):
     """최종 점수를 계산합니다 (100점 만점)."""
@@ -213,28 +532,13 @@ def calculate_final_score(question_count, avg_quality_score):
     quality_score = 50 * (avg_quality_score / 100)
     
     # 질문 횟수 점수 (50점 만점)
-    if question_count <= 10:
-        count_score = 50
-    elif question_count <= 20:
-        # 10회 초과 시 1회당 2.5점씩 감점
-        count_score = 50 - ((question_count - 10) * 2.5)
-    else:
-        # 20회 초과 시 추가 감점
-        count_score = max(0, 25 - ((question_count - 20) * 5))
+    # 10회 초과 시 1회당 2.5점, 20회 초과 시 1회당 2.5점 추가 감점
+    count_score = max(0, 50 - max(0, question_count - 10) * 2.5 - max(0, question_count - 20) * 2.5)
     
     total_score = quality_score + count_score
     
     # 등급 계산
-    if total_score >= 90:
-        grade = "S"
-    elif total_score >= 80:
-        grade = "A"
-    elif total_score >= 70:
-        grade = "B"
-    elif total_score >= 60:
-        grade = "C"
-    else:
-        grade = "D"
+    grade = GRADES[bisect_right(GRADE_THRESHOLDS, total_score)]
     
     return {
         'total_score': round(total_score, 1),
@@ -245,6 +549,124 @@ def calculate_final_score(question_count, avg_quality_score):
         'avg_quality': round(avg_quality_score, 1)
     }
 
+# ===== 통계 캐시 =====
+# 통계는 실시간일 필요가 없으므로 STATS_CACHE_TTL 동안 DB 조회 결과를 재사용
+
+@cached(TTLCache(maxsize=8, ttl=STATS_CACHE_TTL), lock=Lock())
+def get_cached_today_stats(date):
+    return db.get_today_stats(date)
+
+@cached(TTLCache(maxsize=64, ttl=STATS_CACHE_TTL), lock=Lock())
+def get_cached_leaderboard(date, limit):
+    return db.get_leaderboard(date, limit)
+
+@cached(TTLCache(maxsize=1, ttl=STATS_CACHE_TTL), lock=Lock())
+def get_cached_total_stats():
+    return db.get_total_stats()
+
+def invalidate_stats_cache():
+    """게임 결과가 저장되면 통계 캐시를 비웁니다."""
+    get_cached_today_stats.cache_clear()
+    get_cached_leaderboard.cache_clear()
+    get_cached_total_stats.cache_clear()
+
+def format_sse(data, event=None):
+    """Server-Sent Events 메시지를 생성합니다."""
+    payload = orjson.dumps(data).decode()
+    if event:
+        return f"event: {event}\ndata: {payload}\n\n"
+    return f"data: {payload}\n\n"
+
+def check_can_ask(game, session_id):
+    """질문을 받을 수 없는 상태이면 (오류 메시지, 상태 코드)를, 가능하면 None을 반환합니다."""
+    if game.is_finished:
+        return '이미 종료된 게임입니다.', 400
+    
+    # 질문 횟수 제한 체크
+    if len(game.questions) >= MAX_QUESTIONS:
+        logger.warning(f"세션 {session_id}: 최대 질문 횟수({MAX_QUESTIONS})에 도달했습니다.")
+        return f'최대 질문 횟수({MAX_QUESTIONS}회)에 도달했습니다. 이제 범인을 지목해주세요.', 400
+    
+    return None
+
+def stream_answer_events(game, session_id, npc_name, question):
+    """질문을 처리하면서 NPC 응답 조각과 최종 결과를 SSE 이벤트로 내보냅니다.
+    
+    이벤트 순서: 응답 조각 {'delta'} 여러 개 -> 'done' {answer, quality_score, reasoning, total_questions}
+    처리 중 오류가 나면 'error' {error} 이벤트로 끝납니다.
+    """
+    try:
+        # 같은 세션의 요청은 한 번에 하나씩 처리 (질문 기록 경합 및 중복 LLM 호출 방지)
+        with game.lock:
+            # 중복 전송된 질문은 직전 결과를 그대로 반환 (LLM 재호출 방지)
+            last_record = game.questions[-1] if game.questions else None
+            if (last_record
+                    and last_record['npc_name'] == npc_name
+                    and last_record['question'] == question
+                    and time.time_ns() - last_record['ts'] < DUPLICATE_QUESTION_WINDOW * 1_000_000_000):
+                yield format_sse({
+                    'answer': last_record['answer'],
+                    'quality_score': last_record['quality_score'],
+                    'reasoning': last_record['reasoning'],
+                    'total_questions': len(game.questions)
+                }, event='done')
+                return
+            
+            # 대기하는 동안 상태가 바뀌었을 수 있으므로 다시 확인
+            rejection = check_can_ask(game, session_id)
+            if rejection:
+                yield format_sse({'error': rejection[0]}, event='error')
+                return
+            
+            # 질문 품질 평가는 NPC 응답 스트리밍과 동시에 진행
+            eval_future = EXECUTOR.submit(evaluate_question_quality, question, game.scenario_context)
+            
+            answer_parts = []
+            for text in stream_npc_response(question, game.npc_models[npc_name], game.history_tail):
+                answer_parts.append(text)
+                yield format_sse({'delta': text})
+            answer = ''.join(answer_parts).strip()
+            
+            evaluation = eval_future.result()
+            
+            # 질문 기록 저장
+            ts = time.time_ns()
+            question_record = {
+                'npc_name': npc_name,
+                'question': question,
+                'answer': answer,
+                'quality_score': evaluation['score'],
+                'reasoning': evaluation['reasoning'],
+                'ts': ts  # 기록 시각 (epoch 나노초)
+            }
+            game.questions.append(question_record)
+            game.history_tail.append(format_history_entry(npc_name, question, answer))
+            game.quality_sum += evaluation['score']
+            game.quality_n += 1
+            
+            # DB에 질문 저장 (백그라운드 저장 대기열에 추가)
+            _db_write_queue.put(('question', (
+                session_id,
+                npc_name,
+                question,
+                answer,
+                evaluation['score'],
+                evaluation['reasoning'],
+                # 세션 시각(CURRENT_TIMESTAMP)과 같은 UTC 'YYYY-MM-DD HH:MM:SS' 형식
+                datetime.fromtimestamp(ts / 1_000_000_000, timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+            )))
+            
+            yield format_sse({
+                'answer': answer,
+                'quality_score': evaluation['score'],
+                'reasoning': evaluation['reasoning'],
+                'total_questions': len(game.questions)
+            }, event='done')
+    
+    except Exception as e:
+        logger.error(f"세션 {session_id}: /ask 스트리밍 중 오류 - {str(e)}", exc_info=True)
+        yield format_sse({'error': '질문 처리 중 오류가 발생했습니다.'}, event='error')
+
 # ===== 라우트 정의 =====
 
 @app.route('/')
@@ -257,63 +679,60 @@ def start_game():
     """새 게임 시작 - 시나리오 생성"""
     try:
         # 새 세션 ID 생성
-        session_id = str(uuid.uuid4())
+        session_id = secrets.token_urlsafe(16)
         
         # 일일 시나리오 가져오기 (DB에서 또는 새로 생성)
-        scenario = get_daily_scenario()
         today = datetime.now().date().isoformat()
+        scenario, public_scenario = get_daily_scenario(today)
+        
+        # DB에 게임 세션 저장 (세션 행이 없으면 질문 기록을 저장할 수 없으므로 시작하지 않음)
+        if not db.create_game_session(session_id, today, scenario['culprit']):
+            return jsonify({
+                'success': False,
+                'error': '게임을 시작할 수 없습니다. 잠시 후 다시 시도해주세요.'
+            }), 500
         
         # 게임 데이터 초기화 (인메모리)
-        games[session_id] = {
-            'session_id': session_id,
-            'scenario': scenario,
-            'scenario_date': today,
-            'culprit': scenario['culprit'],
-            'npcs': scenario['npcs'],
-            'questions': [],  # {npc_name, question, answer, quality_score, reasoning}
-            'hints_used': 0,  # 사용한 힌트 횟수
-            'start_time': datetime.now().isoformat(),
-            'is_finished': False
-        }
+        game = GameSession(
+            session_id=session_id,
+            scenario=scenario,
+            scenario_date=today,
+            culprit=scenario['culprit'],
+            npcs=scenario['npcs'],
+            npc_by_name={npc['name']: npc for npc in scenario['npcs']},
+            npc_models={
+                npc['name']: genai.GenerativeModel(
+                    GEMINI_MODEL,
+                    system_instruction=format_npc_system_prompt(npc, scenario)
+                )
+                for npc in scenario['npcs']
+            },
+            scenario_context=f"제목: {scenario['title']}\n상황: {scenario['scenario']}",
+            hint_prompt=format_hint_generation_prompt(scenario['scenario'], scenario['culprit'])
+        )
+        with games_lock:
+            games[session_id] = game
         
-        # DB에 게임 세션 저장
-        db.create_game_session(session_id, today, scenario['culprit'])
+        # 오늘 시나리오의 힌트 묶음을 미리 생성 (날짜별 1회)
+        get_hint_pool(today, scenario)
         
-        # 클라이언트에 전달할 시나리오 정보 (범인 정보 제외)
-        public_scenario = {
-            'session_id': session_id,
-            'title': scenario['title'],
-            'scenario': scenario['scenario'],
-            'victim': scenario['victim'],
-            'location': scenario['location'],
-            'time': scenario['time'],
-            'npcs': [
-                {
-                    'name': npc['name'],
-                    'role': npc['role'],
-                    'personality': npc['personality'],
-                    'relationship': npc['relationship']
-                }
-                for npc in scenario['npcs']
-            ],
-            'key_evidence': scenario.get('key_evidence', [])
-        }
+        # 클라이언트에 전달할 시나리오 정보 (캐시된 공개 시나리오에 세션 ID 추가)
+        public_scenario = {'session_id': session_id, **public_scenario}
         
         logger.info(f"새 게임 시작: {session_id}, 날짜: {today}")
         
-        return jsonify({
-            'success': True,
-            'data': public_scenario
-        })
+        # 가장 큰 응답이므로 한 번에 바이트로 직렬화해 그대로 반환
+        body = orjson.dumps({'success': True, 'data': public_scenario})
+        return app.response_class(body, mimetype='application/json')
     
     except ValueError as e:
-        logging.error(f"게임 시작 중 잘못된 값: {str(e)}")
+        logger.error(f"게임 시작 중 잘못된 값: {str(e)}", exc_info=True)
         return jsonify({
             'success': False,
             'error': '게임 시작 중 오류가 발생했습니다.'
         }), 500
     except Exception as e:
-        logging.error(f"게임 시작 중 오류: {str(e)}")
+        logger.error(f"게임 시작 중 오류: {str(e)}", exc_info=True)
         return jsonify({
             'success': False,
             'error': '게임을 시작할 수 없습니다. 잠시 후 다시 시도해주세요.'
@@ -321,7 +740,7 @@ def start_game():
 
 @app.route('/ask', methods=['POST'])
 def ask_question():
-    """NPC에게 질문하기"""
+    """NPC에게 질문하기 (NPC 응답은 Server-Sent Events로 스트리밍)"""
     try:
         data = request.json
         session_id = data.get('session_id')
@@ -335,101 +754,50 @@ def ask_question():
                 'error': '필수 정보가 누락되었습니다.'
             }), 400
         
-        # 세션 확인
-        if session_id not in games:
+        # 세션 확인 (활동이 있었으므로 보관 시간 연장)
+        game = get_game(session_id, refresh=True)
+        if game is None:
             return jsonify({
                 'success': False,
                 'error': '유효하지 않은 세션입니다.'
             }), 404
         
-        game = games[session_id]
-        
-        if game['is_finished']:
-            return jsonify({
-                'success': False,
-                'error': '이미 종료된 게임입니다.'
-            }), 400
-        
-        # 질문 횟수 제한 체크
-        if len(game['questions']) >= MAX_QUESTIONS:
-            logging.warning(f"세션 {session_id}: 최대 질문 횟수({MAX_QUESTIONS})에 도달했습니다.")
+        rejection = check_can_ask(game, session_id)
+        if rejection:
+            error, status = rejection
             return jsonify({
                 'success': False,
-                'error': f'최대 질문 횟수({MAX_QUESTIONS}회)에 도달했습니다. 이제 범인을 지목해주세요.'
-            }), 400
+                'error': error
+            }), status
         
         # NPC 찾기
-        npc_info = None
-        for npc in game['npcs']:
-            if npc['name'] == npc_name:
-                npc_info = npc
-                break
-        
-        if not npc_info:
+        npc_info = game.npc_by_name.get(npc_name)
+        if npc_info is None:
             return jsonify({
                 'success': False,
                 'error': '존재하지 않는 NPC입니다.'
             }), 404
         
-        # 질문 품질 평가
-        scenario_context = f"제목: {game['scenario']['title']}\n상황: {game['scenario']['scenario']}"
-        evaluation = evaluate_question_quality(question, scenario_context)
-        
-        # NPC 응답 생성
-        answer = generate_npc_response(
-            question, 
-            npc_info, 
-            game['scenario'],
-            game['questions']
-        )
-        
-        # 질문 기록 저장
-        timestamp = datetime.now()
-        question_record = {
-            'npc_name': npc_name,
-            'question': question,
-            'answer': answer,
-            'quality_score': evaluation['score'],
-            'reasoning': evaluation['reasoning'],
-            'timestamp': timestamp.isoformat()
-        }
-        game['questions'].append(question_record)
-        
-        # DB에 질문 저장
-        db.save_question(
-            session_id=session_id,
-            npc_name=npc_name,
-            question=question,
-            answer=answer,
-            quality_score=evaluation['score'],
-            reasoning=evaluation['reasoning'],
-            timestamp=timestamp
+        return Response(
+            stream_with_context(stream_answer_events(game, session_id, npc_name, question)),
+            mimetype='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
         )
-        
-        return jsonify({
-            'success': True,
-            'data': {
-                'answer': answer,
-                'quality_score': evaluation['score'],
-                'reasoning': evaluation['reasoning'],
-                'total_questions': len(game['questions'])
-            }
-        })
     
     except ValueError as e:
-        logging.error(f"세션 {session_id}: 잘못된 입력 값 - {str(e)}")
+        logger.error(f"세션 {session_id}: 잘못된 입력 값 - {str(e)}", exc_info=True)
         return jsonify({
             'success': False,
             'error': '입력 값이 올바르지 않습니다.'
         }), 400
     except KeyError as e:
-        logging.error(f"세션 {session_id}: 필수 키 누락 - {str(e)}")
+        logger.error(f"세션 {session_id}: 필수 키 누락 - {str(e)}", exc_info=True)
         return jsonify({
             'success': False,
             'error': '필수 정보가 누락되었습니다.'
         }), 400
     except Exception as e:
-        logging.error(f"세션 {session_id if 'session_id' in locals() else 'unknown'}: /ask 처리 중 오류 - {str(e)}")
+        logger.error(f"세션 {session_id if 'session_id' in locals() else 'unknown'}: /ask 처리 중 오류 - {str(e)}", exc_info=True)
         return jsonify({
             'success': False,
             'error': '질문 처리 중 오류가 발생했습니다.'
@@ -450,91 +818,90 @@ def accuse_culprit():
                 'error': '필수 정보가 누락되었습니다.'
             }), 400
         
-        # 세션 확인
-        if session_id not in games:
+        # 세션 확인 (활동이 있었으므로 보관 시간 연장)
+        game = get_game(session_id, refresh=True)
+        if game is None:
             return jsonify({
                 'success': False,
                 'error': '유효하지 않은 세션입니다.'
             }), 404
         
-        game = games[session_id]
-        
-        if game['is_finished']:
-            return jsonify({
-                'success': False,
-                'error': '이미 종료된 게임입니다.'
-            }), 400
-        
-        # 정답 확인
-        is_correct = suspect_name == game['culprit']
-        
-        if is_correct:
-            # 점수 계산
-            question_count = len(game['questions'])
-            
-            if question_count == 0:
+        with game.lock:
+            if game.is_finished:
                 return jsonify({
                     'success': False,
-                    'error': '최소 1개의 질문을 해야 합니다.'
+                    'error': '이미 종료된 게임입니다.'
                 }), 400
             
-            avg_quality_score = sum(q['quality_score'] for q in game['questions']) / question_count
+            # 정답 확인
+            is_correct = suspect_name == game.culprit
             
-            score_info = calculate_final_score(question_count, avg_quality_score)
-            
-            # 게임 종료
-            game['is_finished'] = True
-            game['end_time'] = datetime.now().isoformat()
-            game['final_score'] = score_info
-            
-            # DB에 게임 결과 저장
-            db.finish_game_session(
-                session_id=session_id,
-                solved=True,
-                accused_npc=suspect_name,
-                questions_count=question_count,
-                hints_used=game['hints_used'],
-                score_info=score_info
-            )
-            
-            logger.info(f"게임 성공: {session_id}, 점수: {score_info['total_score']}")
-            
-            return jsonify({
-                'success': True,
-                'data': {
-                    'is_correct': True,
-                    'culprit': game['culprit'],
-                    'score': score_info,
-                    'message': f'정답입니다! 범인은 {game["culprit"]}입니다.'
-                }
-            })
-        else:
-            # 오답인 경우 (게임은 계속됨)
-            logger.info(f"오답: {session_id}, 지목: {suspect_name}, 실제 범인: {game['culprit']}")
-            
-            return jsonify({
-                'success': True,
-                'data': {
-                    'is_correct': False,
-                    'message': f'{suspect_name}은(는) 범인이 아닙니다. 다시 추리해보세요.',
-                    'total_questions': len(game['questions'])
-                }
-            })
-    
+            if is_correct:
+                # 점수 계산
+                question_count = len(game.questions)
+                
+                if question_count == 0:
+                    return jsonify({
+                        'success': False,
+                        'error': '최소 1개의 질문을 해야 합니다.'
+                    }), 400
+                
+                avg_quality_score = game.quality_sum / game.quality_n
+                
+                score_info = calculate_final_score(question_count, avg_quality_score)
+                
+                # 게임 종료
+                game.is_finished = True
+                game.end_time = datetime.now().isoformat()
+                game.final_score = score_info
+                
+                # DB에 게임 결과 저장 (남은 질문 기록과 함께 한 트랜잭션으로 처리)
+                _db_write_queue.put(('finish', session_id, {
+                    'solved': True,
+                    'accused_npc': suspect_name,
+                    'questions_count': question_count,
+                    'hints_used': game.hints_used,
+                    'score_info': score_info
+                }))
+                
+                logger.info(f"게임 성공: {session_id}, 점수: {score_info['total_score']}")
+                
+                return jsonify({
+                    'success': True,
+                    'data': {
+                        'is_correct': True,
+                        'culprit': game.culprit,
+                        'score': score_info,
+                        'message': f'정답입니다! 범인은 {game.culprit}입니다.'
+                    }
+                })
+            else:
+                # 오답인 경우 (게임은 계속됨)
+                logger.info(f"오답: {session_id}, 지목: {suspect_name}, 실제 범인: {game.culprit}")
+                
+                return jsonify({
+                    'success': True,
+                    'data': {
+                        'is_correct': False,
+                        'message': f'{suspect_name}은(는) 범인이 아닙니다. 다시 추리해보세요.',
+                        'total_questions': len(game.questions)
+                    }
+                })
+        
     except ValueError as e:
-        logging.error(f"세션 {session_id}: 범인 지목 중 잘못된 값 - {str(e)}")
+        logger.error(f"세션 {session_id}: 범인 지목 중 잘못된 값 - {str(e)}", exc_info=True)
         return jsonify({
             'success': False,
             'error': '입력 값이 올바르지 않습니다.'
         }), 400
     except KeyError as e:
-        logging.error(f"세션 {session_id}: 필수 키 누락 - {str(e)}")
+        logger.error(f"세션 {session_id}: 필수 키 누락 - {str(e)}", exc_info=True)
         return jsonify({
             'success': False,
             'error': '필수 정보가 누락되었습니다.'
         }), 400
     except Exception as e:
-        logging.error(f"세션 {session_id if 'session_id' in locals() else 'unknown'}: /accuse 처리 중 오류 - {str(e)}")
+        logger.error(f"세션 {session_id if 'session_id' in locals() else 'unknown'}: /accuse 처리 중 오류 - {str(e)}", exc_info=True)
         return jsonify({
             'success': False,
             'error': '범인 지목 처리 중 오류가 발생했습니다.'
@@ -553,62 +920,58 @@ def get_hint():
                 'error': '세션 ID가 필요합니다.'
             }), 400
         
-        if session_id not in games:
+        game = get_game(session_id, refresh=True)
+        if game is None:
             return jsonify({
                 'success': False,
                 'error': '유효하지 않은 세션입니다.'
             }), 404
         
-        game = games[session_id]
-        
-        # 힌트 횟수 제한 체크
-        if game['hints_used'] >= MAX_HINTS:
-            logging.warning(f"세션 {session_id}: 최대 힌트 횟수({MAX_HINTS})에 도달했습니다.")
+        with game.lock:
+            # 힌트 횟수 제한 체크
+            if game.hints_used >= MAX_HINTS:
+                logger.warning(f"세션 {session_id}: 최대 힌트 횟수({MAX_HINTS})에 도달했습니다.")
+                return jsonify({
+                    'success': False,
+                    'error': f'최대 힌트 횟수({MAX_HINTS}회)에 도달했습니다. 더 이상 힌트를 받을 수 없습니다.'
+                }), 400
+            
+            # 힌트 가져오기
+            hint = take_hint(game)
+            
+            # 힌트 사용 기록 (질문 품질 점수 감점)
+            hint_record = {
+                'npc_name': 'SYSTEM',
+                'question': '[힌트 요청]',
+                'answer': hint,
+                'quality_score': 0,  # 힌트는 0점
+                'reasoning': '힌트 사용',
+                'ts': time.time_ns()
+            }
+            game.questions.append(hint_record)
+            game.history_tail.append(format_history_entry(hint_record['npc_name'], hint_record['question'], hint))
+            game.hints_used += 1  # 힌트 사용 횟수 증가
+            game.quality_n += 1  # 힌트는 0점으로 평균에 반영
+            
+            logger.info(f"세션 {session_id}: 힌트 제공 ({game.hints_used}/{MAX_HINTS})")
+            
             return jsonify({
-                'success': False,
-                'error': f'최대 힌트 횟수({MAX_HINTS}회)에 도달했습니다. 더 이상 힌트를 받을 수 없습니다.'
-            }), 400
-        
-        # 힌트 생성
-        prompt = format_hint_generation_prompt(
-            game['scenario']['scenario'],
-            game['culprit']
-        )
-        
-        response = model.generate_content(prompt)
-        hint = response.text.strip()
-        
-        # 힌트 사용 기록 (질문 품질 점수 감점)
-        hint_record = {
-            'npc_name': 'SYSTEM',
-            'question': '[힌트 요청]',
-            'answer': hint,
-            'quality_score': 0,  # 힌트는 0점
-            'reasoning': '힌트 사용',
-            'timestamp': datetime.now().isoformat()
-        }
-        game['questions'].append(hint_record)
-        game['hints_used'] += 1  # 힌트 사용 횟수 증가
-        
-        logging.info(f"세션 {session_id}: 힌트 제공 ({game['hints_used']}/{MAX_HINTS})")
+                'success': True,
+                'data': {
+                    'hint': hint,
+                    'penalty': '힌트 사용으로 평균 점수가 낮아집니다.',
+                    'hints_remaining': MAX_HINTS - game.hints_used
+                }
+            })
         
-        return jsonify({
-            'success': True,
-            'data': {
-                'hint': hint,
-                'penalty': '힌트 사용으로 평균 점수가 낮아집니다.',
-                'hints_remaining': MAX_HINTS - game['hints_used']
-            }
-        })
-    
     except ValueError as e:
-        logging.error(f"세션 {session_id}: 힌트 생성 중 잘못된 값 - {str(e)}")
+        logger.error(f"세션 {session_id}: 힌트 생성 중 잘못된 값 - {str(e)}", exc_info=True)
         return jsonify({
             'success': False,
             'error': '힌트 생성 중 오류가 발생했습니다.'
         }), 500
     except Exception as e:
-        logging.error(f"세션 {session_id if 'session_id' in locals() else 'unknown'}: /hint 처리 중 오류 - {str(e)}")
+        logger.error(f"세션 {session_id if 'session_id' in locals() else 'unknown'}: /hint 처리 중 오류 - {str(e)}", exc_info=True)
         return jsonify({
             'success': False,
             'error': '힌트 요청 처리 중 오류가 발생했습니다.'
@@ -617,29 +980,28 @@ def get_hint():
 @app.route('/game/<session_id>', methods=['GET'])
 def get_game_state(session_id):
     """게임 상태 조회"""
-    if session_id not in games:
+    game = get_game(session_id)
+    if game is None:
         return jsonify({
             'success': False,
             'error': '유효하지 않은 세션입니다.'
         }), 404
     
-    game = games[session_id]
-    
     # 민감한 정보 제외하고 반환
     return jsonify({
         'success': True,
         'data': {
             'session_id': session_id,
             'scenario': {
-                'title': game['scenario']['title'],
-                'scenario': game['scenario']['scenario'],
-                'victim': game['scenario']['victim'],
-                'location': game['scenario']['location'],
-                'time': game['scenario']['time']
+                'title': game.scenario['title'],
+                'scenario': game.scenario['scenario'],
+                'victim': game.scenario['victim'],
+                'location': game.scenario['location'],
+                'time': game.scenario['time']
             },
-            'total_questions': len(game['questions']),
-            'is_finished': game['is_finished'],
-            'final_score': game.get('final_score')
+            'total_questions': len(game.questions),
+            'is_finished': game.is_finished,
+            'final_score': game.final_score
         }
     })
 
@@ -648,7 +1010,7 @@ def get_today_statistics():
     """오늘의 게임 통계"""
     try:
         today = datetime.now().date().isoformat()
-        stats = db.get_today_stats(today)
+        stats = get_cached_today_stats(today)
         
         return jsonify({
             'success': True,
@@ -658,7 +1020,7 @@ def get_today_statistics():
             }
         })
     except Exception as e:
-        logger.error(f"오늘 통계 조회 오류: {e}")
+        logger.error(f"오늘 통계 조회 오류: {e}", exc_info=True)
         return jsonify({
             'success': False,
             'error': '통계 조회 중 오류가 발생했습니다.'
@@ -669,8 +1031,8 @@ def get_today_leaderboard():
     """오늘의 리더보드 (상위 10명)"""
     try:
         today = datetime.now().date().isoformat()
-        limit = int(request.args.get('limit', 10))
-        leaderboard = db.get_leaderboard(today, limit)
+        limit = max(1, min(int(request.args.get('limit', 10)), MAX_LEADERBOARD_LIMIT))
+        leaderboard = get_cached_leaderboard(today, limit)
         
         return jsonify({
             'success': True,
@@ -680,7 +1042,7 @@ def get_today_leaderboard():
             }
         })
     except Exception as e:
-        logger.error(f"리더보드 조회 오류: {e}")
+        logger.error(f"리더보드 조회 오류: {e}", exc_info=True)
         return jsonify({
             'success': False,
             'error': '리더보드 조회 중 오류가 발생했습니다.'
@@ -690,14 +1052,14 @@ def get_today_leaderboard():
 def get_total_statistics():
     """전체 게임 통계"""
     try:
-        stats = db.get_total_stats()
+        stats = get_cached_total_stats()
         
         return jsonify({
             'success': True,
             'data': stats
         })
     except Exception as e:
-        logger.error(f"전체 통계 조회 오류: {e}")
+        logger.error(f"전체 통계 조회 오류: {e}", exc_info=True)
         return jsonify({
             'success': False,
             'error': '통계 조회 중 오류가 발생했습니다.'
@@ -3,31 +3,198 @@ SQLite 데이터베이스 관리 모듈
 게임 시나리오, 세션, 통계를 영구 저장합니다.
 """
 
+import os
 import sqlite3
-import json
+import orjson
+import queue
+import atexit
 import logging
-from datetime import datetime
+import threading
+from datetime import datetime, timedelta, timezone
 from contextlib import contextmanager
-from typing import Optional, Dict, List, Any
+from functools import lru_cache
+from typing import Optional, Dict, Iterator, List, Any
+
+from prompts import DEFAULT_SCENARIO, DEFAULT_SCENARIO_JSON
 
 logger = logging.getLogger(__name__)
 
-DB_PATH = 'game_data.db'
+# DB 파일 경로 (':memory:'이면 프로세스 내 공유 메모리 DB 사용 - 개발/테스트용)
+DB_PATH = os.getenv('DB_PATH', 'game_data.db')
+MEMORY_DB_URI = 'file::memory:?cache=shared'
+
+# 연결마다 적용하는 PRAGMA (연결 단위 설정이라 파일에 저장되지 않음)
+CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",  # WAL 모드에서는 체크포인트 시에만 fsync
+    "PRAGMA wal_autocheckpoint=1000",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-64000",  # 페이지 캐시 약 64MB
+    "PRAGMA mmap_size=268435456",  # 256MB 메모리 매핑 읽기
+    "PRAGMA foreign_keys=ON",
+)
+
+DB_POOL_SIZE = 8  # 읽기용 연결 풀 크기
+OPTIMIZE_EVERY = 500  # 쓰기 연결을 이 횟수만큼 사용할 때마다 PRAGMA optimize 실행
+
+_initialized = False  # init_db 실행 여부
+
+# 읽기용 연결 풀 (최근 사용한 연결을 먼저 재사용하여 캐시가 따뜻한 연결 활용)
+_pool = queue.LifoQueue(maxsize=DB_POOL_SIZE)
+
+# 쓰기는 하나의 연결로 직렬화 (SQLite는 동시에 한 명만 쓸 수 있음)
+_writer_conn = None
+_writer_lock = threading.Lock()
+_writer_uses = 0  # 쓰기 연결 사용 횟수 (_writer_lock 안에서만 변경)
+
+
+# 공유 메모리 DB는 마지막 연결이 닫히면 사라지므로 프로세스 동안 유지하는 연결
+_memory_sentinel = None
+
+
+def _connect():
+    """DB_PATH에 맞게 연결 (':memory:'이면 모든 연결이 같은 메모리 DB를 공유)"""
+    global _memory_sentinel
+    if DB_PATH != ':memory:':
+        return sqlite3.connect(DB_PATH, check_same_thread=False, cached_statements=256)
+    
+    if _memory_sentinel is None:
+        _memory_sentinel = sqlite3.connect(MEMORY_DB_URI, uri=True, check_same_thread=False)
+    return sqlite3.connect(MEMORY_DB_URI, uri=True, check_same_thread=False, cached_statements=256)
+
+
+def _make_conn():
+    """PRAGMA가 적용된 새 연결 생성 (풀에서 여러 스레드가 번갈아 사용)"""
+    conn = _connect()
+    conn.row_factory = sqlite3.Row  # 딕셔너리처럼 접근 가능
+    for pragma in CONNECTION_PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
 
 @contextmanager
 def get_db():
-    """데이터베이스 연결 컨텍스트 매니저"""
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row  # 딕셔너리처럼 접근 가능
+    """읽기용 데이터베이스 연결 컨텍스트 매니저 (연결 풀에서 대여)"""
+    try:
+        conn = _pool.get_nowait()
+    except queue.Empty:
+        conn = _make_conn()
     try:
         yield conn
     finally:
-        conn.close()
+        if conn.in_transaction:
+            conn.rollback()
+        try:
+            _pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+
+@contextmanager
+def get_write_db():
+    """쓰기용 데이터베이스 연결 컨텍스트 매니저 (단일 쓰기 연결을 잠금으로 보호)"""
+    global _writer_conn, _writer_uses
+    with _writer_lock:
+        if _writer_conn is None:
+            _writer_conn = _make_conn()
+        try:
+            yield _writer_conn
+        finally:
+            # 커밋되지 않은 변경은 다음 사용자에게 넘기지 않음
+            if _writer_conn.in_transaction:
+                _writer_conn.rollback()
+            
+            # 주기적으로 플래너 통계 갱신 (필요한 인덱스만 ANALYZE)
+            # 쓰기 잠금이 필요할 수 있으므로 읽기 연결이 아닌 쓰기 연결에서 실행
+            _writer_uses += 1
+            if _writer_uses % OPTIMIZE_EVERY == 0:
+                _optimize(_writer_conn)
+
+
+def _optimize(conn):
+    """PRAGMA optimize 실행 (실패해도 요청 처리에는 영향 없음)"""
+    try:
+        conn.execute("PRAGMA optimize")
+    except sqlite3.Error as e:
+        logger.warning(f"PRAGMA optimize 실패: {e}")
+
+
+def close_all():
+    """풀과 쓰기 연결을 모두 닫음 (프로세스 종료 시)"""
+    global _writer_conn
+    while True:
+        try:
+            _pool.get_nowait().close()
+        except queue.Empty:
+            break
+    with _writer_lock:
+        if _writer_conn is not None:
+            _optimize(_writer_conn)
+            _writer_conn.close()
+            _writer_conn = None
+
+
+atexit.register(close_all)
+
+
+# 질문 히스토리 테이블 정의
+# id는 AUTOINCREMENT 없이 rowid 별칭으로 사용 (sqlite_sequence 갱신 없음)
+_QUESTIONS_TABLE_DDL = """
+    CREATE TABLE IF NOT EXISTS {table} (
+        id INTEGER PRIMARY KEY,
+        session_id TEXT NOT NULL,
+        npc_name TEXT NOT NULL,
+        question TEXT NOT NULL,
+        answer TEXT NOT NULL,
+        quality_score INTEGER NOT NULL,
+        reasoning TEXT,
+        timestamp TIMESTAMP NOT NULL,
+        FOREIGN KEY (session_id) REFERENCES game_sessions(session_id) ON DELETE CASCADE
+    )
+"""
+
+
+def _migrate_questions_autoincrement(db):
+    """예전 스키마(AUTOINCREMENT)의 questions 테이블을 새 정의로 복사하여 교체"""
+    row = db.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'questions'"
+    ).fetchone()
+    if not row or 'AUTOINCREMENT' not in row['sql'].upper():
+        return
+    
+    logger.info("questions 테이블에서 AUTOINCREMENT 제거 (마이그레이션)")
+    with db:
+        db.execute("DROP TABLE IF EXISTS questions_new")
+        db.execute(_QUESTIONS_TABLE_DDL.format(table='questions_new'))
+        # 예전에는 외래 키 검사 없이 세션을 삭제해 부모 없는 질문이 남아 있을 수 있음
+        # (ON DELETE CASCADE였다면 함께 지워졌을 행이므로 복사하지 않음)
+        cur = db.execute("""
+            INSERT INTO questions_new
+            SELECT * FROM questions
+            WHERE session_id IN (SELECT session_id FROM game_sessions)
+        """)
+        orphaned = db.execute("SELECT COUNT(*) FROM questions").fetchone()[0] - cur.rowcount
+        if orphaned:
+            logger.info(f"세션이 삭제된 질문 {orphaned}개는 옮기지 않음")
+        db.execute("DROP TABLE questions")
+        db.execute("ALTER TABLE questions_new RENAME TO questions")
 
 
 def init_db():
     """데이터베이스 초기화 및 테이블 생성"""
-    with get_db() as db:
+    global _initialized
+    if _initialized:
+        return
+    
+    with get_write_db() as db:
+        # 삭제된 페이지를 incremental_vacuum으로 반환할 수 있도록 설정
+        # (기존 파일은 VACUUM을 한 번 실행해야 모드가 바뀜)
+        if db.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+            db.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            db.execute("VACUUM")
+        
+        # WAL 모드는 DB 파일에 유지됨
+        db.execute("PRAGMA journal_mode=WAL")
+        
         # 일일 시나리오 테이블
         db.execute("""
             CREATE TABLE IF NOT EXISTS daily_scenarios (
@@ -60,21 +227,18 @@ def init_db():
         """)
         
         # 질문 히스토리 테이블
+        db.execute(_QUESTIONS_TABLE_DDL.format(table='questions'))
+        _migrate_questions_autoincrement(db)
+        
+        # 인덱스 생성
+        existing_indexes = {
+            row[0] for row in db.execute("SELECT name FROM sqlite_master WHERE type = 'index'")
+        }
         db.execute("""
-            CREATE TABLE IF NOT EXISTS questions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                session_id TEXT NOT NULL,
-                npc_name TEXT NOT NULL,
-                question TEXT NOT NULL,
-                answer TEXT NOT NULL,
-                quality_score INTEGER NOT NULL,
-                reasoning TEXT,
-                timestamp TIMESTAMP NOT NULL,
-                FOREIGN KEY (session_id) REFERENCES game_sessions(session_id) ON DELETE CASCADE
-            )
+            CREATE INDEX IF NOT EXISTS idx_scenarios_created 
+            ON daily_scenarios(created_at)
         """)
         
-        # 인덱스 생성
         db.execute("""
             CREATE INDEX IF NOT EXISTS idx_sessions_date 
             ON game_sessions(scenario_date)
@@ -85,38 +249,189 @@ def init_db():
             ON game_sessions(is_finished, end_time)
         """)
         
+        # 끝나지 않은 세션만 담는 부분 인덱스 (버려진 세션 정리 시 시작 시각으로 바로 찾음)
+        # 이전 정의(session_id 기준)는 읽는 쿼리가 없어 대체
+        db.execute("DROP INDEX IF EXISTS idx_active_sessions")
+        db.execute("""
+            CREATE INDEX IF NOT EXISTS idx_sessions_active_start
+            ON game_sessions(start_time)
+            WHERE is_finished = 0
+        """)
+
+        # 세션별 질문을 시간순으로 바로 찾을 수 있는 인덱스 (session_id 단독 인덱스를 대체)
+        db.execute("DROP INDEX IF EXISTS idx_questions_session")
         db.execute("""
-            CREATE INDEX IF NOT EXISTS idx_questions_session 
-            ON questions(session_id)
+            CREATE INDEX IF NOT EXISTS idx_questions_session_time 
+            ON questions(session_id, timestamp)
+        """)
+        
+        # 리더보드용 부분 커버링 인덱스 (정렬 순서대로 읽고 LIMIT에서 멈춤)
+        db.execute("""
+            CREATE INDEX IF NOT EXISTS idx_leaderboard 
+            ON game_sessions(scenario_date, final_score DESC, questions_count ASC,
+                             session_id, grade, hints_used, end_time, is_finished, solved)
+            WHERE is_finished = 1 AND solved = 1
         """)
         
         db.commit()
+        
+        # 부분 인덱스가 새로 생겼으면 플래너 통계 갱신 (통계가 없으면 부분 인덱스를 고르지 않음)
+        if not {'idx_leaderboard', 'idx_sessions_active_start'} <= existing_indexes:
+            db.execute("ANALYZE")
+        _optimize(db)
+        _initialized = True
         logger.info("데이터베이스 초기화 완료")
 
 
+# ===== SQL 문 =====
+# 같은 문자열 객체를 재사용하여 연결별 prepared statement 캐시에 적중시킴
+
+_SQL_SELECT_SCENARIO = """
+    SELECT scenario_json FROM daily_scenarios WHERE date = ?
+"""
+
+_SQL_SAVE_SCENARIO = """
+    INSERT INTO daily_scenarios (date, scenario_json)
+    VALUES (?, ?)
+    ON CONFLICT(date) DO UPDATE SET scenario_json = excluded.scenario_json
+"""
+
+_SQL_DELETE_OLD_SCENARIOS = """
+    DELETE FROM daily_scenarios
+    WHERE created_at < ?
+"""
+
+_SQL_INSERT_SESSION = """
+    INSERT INTO game_sessions
+        (session_id, scenario_date, start_time, culprit)
+    VALUES (?, ?, CURRENT_TIMESTAMP, ?)
+"""
+
+_SQL_FINISH_SESSION_WITH_SCORE = """
+    UPDATE game_sessions
+    SET end_time = CURRENT_TIMESTAMP, is_finished = 1, solved = ?, accused_npc = ?,
+        questions_count = ?, hints_used = ?,
+        final_score = ?, quality_score = ?, count_score = ?,
+        grade = ?, avg_quality = ?
+    WHERE session_id = ?
+"""
+
+_SQL_FINISH_SESSION = """
+    UPDATE game_sessions
+    SET end_time = CURRENT_TIMESTAMP, is_finished = 1, solved = ?, accused_npc = ?,
+        questions_count = ?, hints_used = ?
+    WHERE session_id = ?
+"""
+
+_SQL_SELECT_SESSION = """
+    SELECT * FROM game_sessions WHERE session_id = ?
+"""
+
+_SQL_DELETE_OLD_SESSIONS = """
+    DELETE FROM game_sessions
+    WHERE is_finished = 1
+      AND end_time < ?
+"""
+
+# 범인을 맞히지 못한 채 버려진 세션 (인메모리 게임은 만료되어 더 이상 종료될 수 없음)
+_SQL_DELETE_ABANDONED_SESSIONS = """
+    DELETE FROM game_sessions
+    WHERE is_finished = 0
+      AND start_time < ?
+"""
+
+_SQL_INSERT_QUESTION = """
+    INSERT INTO questions
+        (session_id, npc_name, question, answer, quality_score, reasoning, timestamp)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+_SQL_SELECT_SESSION_QUESTIONS = """
+    SELECT {columns} FROM questions
+    WHERE session_id = ?
+    ORDER BY timestamp ASC
+"""
+
+_SQL_SELECT_RECENT_SESSION_QUESTIONS = """
+    SELECT {columns} FROM questions
+    WHERE session_id = ?
+    ORDER BY timestamp DESC
+    LIMIT ?
+"""
+
+# get_session_questions에서 조회할 수 있는 컬럼
+QUESTION_COLUMNS = frozenset((
+    'id', 'session_id', 'npc_name', 'question', 'answer',
+    'quality_score', 'reasoning', 'timestamp'
+))
+
+_SQL_STATS_TODAY = """
+    SELECT
+        COUNT(*) as total_games,
+        COUNT(*) FILTER (WHERE is_finished = 1) as completed_games,
+        COUNT(*) FILTER (WHERE solved = 1) as solved_games,
+        AVG(final_score) as avg_score,
+        AVG(questions_count) FILTER (WHERE questions_count > 0) as avg_questions,
+        AVG(hints_used) FILTER (WHERE hints_used > 0) as avg_hints
+    FROM game_sessions
+    WHERE scenario_date = ?
+"""
+
+_SQL_LEADERBOARD = """
+    SELECT session_id, final_score, grade, questions_count, hints_used, end_time
+    FROM game_sessions
+    WHERE scenario_date = ? AND is_finished = 1 AND solved = 1
+    ORDER BY final_score DESC, questions_count ASC
+    LIMIT ?
+"""
+
+_SQL_STATS_TOTAL = """
+    SELECT
+        COUNT(*) as total_games,
+        COUNT(*) FILTER (WHERE is_finished = 1) as completed_games,
+        COUNT(*) FILTER (WHERE solved = 1) as solved_games,
+        AVG(final_score) as avg_score,
+        COUNT(DISTINCT scenario_date) as total_days
+    FROM game_sessions
+"""
+
+
+def _utc_cutoff(**delta) -> str:
+    """지금(UTC)에서 delta만큼 이전 시각을 CURRENT_TIMESTAMP와 같은 형식으로 반환
+    
+    컬럼을 식으로 감싸지 않고 상수와 비교해야 인덱스를 사용할 수 있습니다.
+    """
+    return (datetime.now(timezone.utc) - timedelta(**delta)).strftime('%Y-%m-%d %H:%M:%S')
+
+
 # ===== 일일 시나리오 관리 =====
 
 def get_daily_scenario(date: str) -> Optional[Dict[str, Any]]:
     """특정 날짜의 시나리오 조회"""
     with get_db() as db:
         row = db.execute(
-            "SELECT scenario_json FROM daily_scenarios WHERE date = ?",
+            _SQL_SELECT_SCENARIO,
             (date,)
         ).fetchone()
         
         if row:
-            return json.loads(row['scenario_json'])
+            return orjson.loads(row['scenario_json'])
         return None
 
 
 def save_daily_scenario(date: str, scenario: Dict[str, Any]) -> bool:
     """일일 시나리오 저장"""
+    # 기본 시나리오는 미리 직렬화된 문자열 사용
+    if scenario is DEFAULT_SCENARIO:
+        scenario_json = DEFAULT_SCENARIO_JSON
+    else:
+        scenario_json = orjson.dumps(scenario).decode()
+    
     try:
-        with get_db() as db:
+        with get_write_db() as db:
             db.execute(
-                """INSERT OR REPLACE INTO daily_scenarios (date, scenario_json, created_at)
-                   VALUES (?, ?, ?)""",
-                (date, json.dumps(scenario, ensure_ascii=False), datetime.now())
+                _SQL_SAVE_SCENARIO,
+                (date, scenario_json)
             )
             db.commit()
             logger.info(f"일일 시나리오 저장 완료: {date}")
@@ -129,11 +444,10 @@ def save_daily_scenario(date: str, scenario: Dict[str, Any]) -> bool:
 def delete_old_scenarios(days: int = 30):
     """오래된 시나리오 삭제 (기본 30일 이상)"""
     try:
-        with get_db() as db:
+        with get_write_db() as db:
             deleted = db.execute(
-                """DELETE FROM daily_scenarios 
-                   WHERE created_at < datetime('now', '-' || ? || ' days')""",
-                (days,)
+                _SQL_DELETE_OLD_SCENARIOS,
+                (_utc_cutoff(days=days),)
             )
             db.commit()
             logger.info(f"오래된 시나리오 {deleted.rowcount}개 삭제")
@@ -143,17 +457,24 @@ def delete_old_scenarios(days: int = 30):
         return 0
 
 
+def incremental_vacuum(pages: int = 100):
+    """삭제로 비워진 페이지를 최대 pages개까지 파일에서 반환"""
+    try:
+        with get_write_db() as db:
+            db.execute(f"PRAGMA incremental_vacuum({int(pages)})").fetchall()
+    except Exception as e:
+        logger.error(f"incremental_vacuum 실패: {e}")
+
+
 # ===== 게임 세션 관리 =====
 
 def create_game_session(session_id: str, scenario_date: str, culprit: str) -> bool:
     """새 게임 세션 생성"""
     try:
-        with get_db() as db:
+        with get_write_db() as db:
             db.execute(
-                """INSERT INTO game_sessions 
-                   (session_id, scenario_date, start_time, culprit)
-                   VALUES (?, ?, ?, ?)""",
-                (session_id, scenario_date, datetime.now(), culprit)
+                _SQL_INSERT_SESSION,
+                (session_id, scenario_date, culprit)
             )
             db.commit()
             logger.info(f"게임 세션 생성: {session_id}")
@@ -163,6 +484,29 @@ def create_game_session(session_id: str, scenario_date: str, culprit: str) -> bo
         return False
 
 
+def _finish_session_statement(
+    session_id: str,
+    solved: bool,
+    accused_npc: str,
+    questions_count: int,
+    hints_used: int,
+    score_info: Optional[Dict[str, Any]] = None
+) -> tuple:
+    """세션 종료 UPDATE 문과 파라미터"""
+    if score_info:
+        return _SQL_FINISH_SESSION_WITH_SCORE, (
+            solved, accused_npc,
+            questions_count, hints_used,
+            score_info.get('total_score'),
+            score_info.get('quality_score'),
+            score_info.get('count_score'),
+            score_info.get('grade'),
+            score_info.get('avg_quality'),
+            session_id
+        )
+    return _SQL_FINISH_SESSION, (solved, accused_npc, questions_count, hints_used, session_id)
+
+
 def finish_game_session(
     session_id: str,
     solved: bool,
@@ -172,37 +516,31 @@ def finish_game_session(
     score_info: Optional[Dict[str, Any]] = None
 ) -> bool:
     """게임 세션 종료 및 결과 저장"""
+    return finalize_session(
+        session_id, [],
+        solved=solved,
+        accused_npc=accused_npc,
+        questions_count=questions_count,
+        hints_used=hints_used,
+        score_info=score_info
+    )
+
+
+def finalize_session(session_id: str, pending_questions: List[tuple], **finish_args) -> bool:
+    """남은 질문 저장과 세션 종료를 한 트랜잭션으로 처리
+    
+    pending_questions: save_questions_bulk와 같은 형식의 질문 튜플 목록
+    finish_args: finish_game_session의 나머지 인자
+    """
+    sql, params = _finish_session_statement(session_id, **finish_args)
     try:
-        with get_db() as db:
-            if score_info:
-                db.execute(
-                    """UPDATE game_sessions 
-                       SET end_time = ?, is_finished = 1, solved = ?, accused_npc = ?,
-                           questions_count = ?, hints_used = ?,
-                           final_score = ?, quality_score = ?, count_score = ?,
-                           grade = ?, avg_quality = ?
-                       WHERE session_id = ?""",
-                    (
-                        datetime.now(), solved, accused_npc,
-                        questions_count, hints_used,
-                        score_info.get('total_score'),
-                        score_info.get('quality_score'),
-                        score_info.get('count_score'),
-                        score_info.get('grade'),
-                        score_info.get('avg_quality'),
-                        session_id
-                    )
-                )
-            else:
-                db.execute(
-                    """UPDATE game_sessions 
-                       SET end_time = ?, is_finished = 1, solved = ?, accused_npc = ?,
-                           questions_count = ?, hints_used = ?
-                       WHERE session_id = ?""",
-                    (datetime.now(), solved, accused_npc, questions_count, hints_used, session_id)
-                )
+        with get_write_db() as db:
+            db.execute("BEGIN IMMEDIATE")
+            if pending_questions:
+                db.executemany(_SQL_INSERT_QUESTION, pending_questions)
+            db.execute(sql, params)
             db.commit()
-            logger.info(f"게임 세션 종료: {session_id}, 정답: {solved}")
+            logger.info(f"게임 세션 종료: {session_id}, 정답: {finish_args.get('solved')}")
             return True
     except Exception as e:
         logger.error(f"세션 종료 실패: {e}")
@@ -213,7 +551,7 @@ def get_game_session(session_id: str) -> Optional[Dict[str, Any]]:
     """게임 세션 조회"""
     with get_db() as db:
         row = db.execute(
-            "SELECT * FROM game_sessions WHERE session_id = ?",
+            _SQL_SELECT_SESSION,
             (session_id,)
         ).fetchone()
         
@@ -223,18 +561,15 @@ def get_game_session(session_id: str) -> Optional[Dict[str, Any]]:
 
 
 def delete_old_sessions(hours: int = 24):
-    """오래된 완료 세션 삭제"""
+    """오래된 완료 세션과 끝나지 않은 채 버려진 세션 삭제"""
     try:
-        with get_db() as db:
-            deleted = db.execute(
-                """DELETE FROM game_sessions 
-                   WHERE is_finished = 1 
-                   AND end_time < datetime('now', '-' || ? || ' hours')""",
-                (hours,)
-            )
-            db.commit()
-            logger.info(f"오래된 세션 {deleted.rowcount}개 삭제")
-            return deleted.rowcount
+        cutoff = _utc_cutoff(hours=hours)
+        with get_write_db() as db:
+            with db:
+                finished = db.execute(_SQL_DELETE_OLD_SESSIONS, (cutoff,)).rowcount
+                abandoned = db.execute(_SQL_DELETE_ABANDONED_SESSIONS, (cutoff,)).rowcount
+            logger.info(f"오래된 세션 {finished}개, 버려진 세션 {abandoned}개 삭제")
+            return finished + abandoned
     except Exception as e:
         logger.error(f"세션 삭제 실패: {e}")
         return 0
@@ -249,35 +584,84 @@ def save_question(
     answer: str,
     quality_score: int,
     reasoning: str,
-    timestamp: datetime
+    timestamp: str
 ) -> bool:
-    """질문 저장"""
+    """질문 저장 (timestamp는 UTC 'YYYY-MM-DD HH:MM:SS')"""
+    return save_questions_bulk(
+        [(session_id, npc_name, question, answer, quality_score, reasoning, timestamp)]
+    )
+
+
+def save_questions_bulk(rows: List[tuple]) -> bool:
+    """질문 여러 개를 한 트랜잭션으로 저장
+    
+    rows: (session_id, npc_name, question, answer, quality_score, reasoning, timestamp) 튜플 목록
+    timestamp는 세션 시각과 같은 UTC 'YYYY-MM-DD HH:MM:SS' 문자열
+    """
     try:
-        with get_db() as db:
-            db.execute(
-                """INSERT INTO questions 
-                   (session_id, npc_name, question, answer, quality_score, reasoning, timestamp)
-                   VALUES (?, ?, ?, ?, ?, ?, ?)""",
-                (session_id, npc_name, question, answer, quality_score, reasoning, timestamp)
-            )
-            db.commit()
-            return True
+        with get_write_db() as db:
+            try:
+                with db:  # 성공 시 커밋, 예외 시 롤백
+                    db.executemany(
+                        _SQL_INSERT_QUESTION,
+                        rows
+                    )
+                return True
+            except sqlite3.Error as e:
+                if len(rows) == 1:
+                    raise
+                logger.warning(f"질문 일괄 저장 실패 ({len(rows)}개), 한 개씩 다시 저장: {e}")
+            
+            # 문제가 된 행만 버리도록 한 개씩 저장
+            failed = 0
+            for row in rows:
+                try:
+                    with db:
+                        db.execute(_SQL_INSERT_QUESTION, row)
+                except sqlite3.Error as e:
+                    failed += 1
+                    logger.error(f"질문 저장 실패 (세션 {row[0]}): {e}")
+            return failed == 0
     except Exception as e:
-        logger.error(f"질문 저장 실패: {e}")
+        logger.error(f"질문 일괄 저장 실패 ({len(rows)}개): {e}")
         return False
 
 
-def get_session_questions(session_id: str) -> List[Dict[str, Any]]:
-    """세션의 모든 질문 조회"""
+@lru_cache(maxsize=32)
+def _session_questions_sql(template: str, columns: tuple) -> str:
+    """컬럼 조합별 SQL (같은 문자열 객체를 반환하여 statement 캐시 적중)"""
+    if columns != ("*",):
+        unknown = set(columns) - QUESTION_COLUMNS
+        if unknown:
+            raise ValueError(f"알 수 없는 컬럼: {sorted(unknown)}")
+    return template.format(columns=', '.join(columns))
+
+
+def get_session_questions(session_id: str, columns: tuple = ("*",)) -> List[sqlite3.Row]:
+    """세션의 모든 질문 조회
+    
+    columns로 필요한 컬럼만 지정할 수 있습니다 (예: ("question", "answer")).
+    sqlite3.Row는 인덱스와 컬럼명 접근을 모두 지원하므로 dict로 변환하지 않습니다.
+    """
+    sql = _session_questions_sql(_SQL_SELECT_SESSION_QUESTIONS, tuple(columns))
     with get_db() as db:
-        rows = db.execute(
-            """SELECT * FROM questions 
-               WHERE session_id = ? 
-               ORDER BY timestamp ASC""",
-            (session_id,)
-        ).fetchall()
-        
-        return [dict(row) for row in rows]
+        return db.execute(sql, (session_id,)).fetchall()
+
+
+def iter_session_questions_desc(
+    session_id: str,
+    limit: int,
+    columns: tuple = ("question", "answer")
+) -> Iterator[sqlite3.Row]:
+    """세션의 최근 질문을 최신순으로 최대 limit개 반환
+    
+    (session_id, timestamp) 인덱스를 역순으로 읽고 LIMIT에서 멈추므로
+    세션 길이와 관계없이 limit개만 읽습니다. 시간순이 필요하면 호출 측에서 뒤집습니다.
+    """
+    sql = _session_questions_sql(_SQL_SELECT_RECENT_SESSION_QUESTIONS, tuple(columns))
+    with get_db() as db:
+        rows = db.execute(sql, (session_id, limit)).fetchall()
+    yield from rows
 
 
 # ===== 통계 조회 =====
@@ -286,15 +670,7 @@ def get_today_stats(date: str) -> Dict[str, Any]:
     """오늘의 게임 통계"""
     with get_db() as db:
         stats = db.execute(
-            """SELECT 
-                COUNT(*) as total_games,
-                SUM(CASE WHEN is_finished = 1 THEN 1 ELSE 0 END) as completed_games,
-                SUM(CASE WHEN solved = 1 THEN 1 ELSE 0 END) as solved_games,
-                AVG(CASE WHEN final_score IS NOT NULL THEN final_score END) as avg_score,
-                AVG(CASE WHEN questions_count > 0 THEN questions_count END) as avg_questions,
-                AVG(CASE WHEN hints_used > 0 THEN hints_used END) as avg_hints
-               FROM game_sessions
-               WHERE scenario_date = ?""",
+            _SQL_STATS_TODAY,
             (date,)
         ).fetchone()
         
@@ -305,11 +681,7 @@ def get_leaderboard(date: str, limit: int = 10) -> List[Dict[str, Any]]:
     """리더보드 조회 (높은 점수 순)"""
     with get_db() as db:
         rows = db.execute(
-            """SELECT session_id, final_score, grade, questions_count, hints_used, end_time
-               FROM game_sessions
-               WHERE scenario_date = ? AND is_finished = 1 AND solved = 1
-               ORDER BY final_score DESC, questions_count ASC
-               LIMIT ?""",
+            _SQL_LEADERBOARD,
             (date, limit)
         ).fetchall()
         
@@ -320,13 +692,7 @@ def get_total_stats() -> Dict[str, Any]:
     """전체 통계"""
     with get_db() as db:
         stats = db.execute(
-            """SELECT 
-                COUNT(*) as total_games,
-                SUM(CASE WHEN is_finished = 1 THEN 1 ELSE 0 END) as completed_games,
-                SUM(CASE WHEN solved = 1 THEN 1 ELSE 0 END) as solved_games,
-                AVG(CASE WHEN final_score IS NOT NULL THEN final_score END) as avg_score,
-                COUNT(DISTINCT scenario_date) as total_days
-               FROM game_sessions"""
+            _SQL_STATS_TOTAL
         ).fetchone()
         
         return dict(stats) if stats else {}
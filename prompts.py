@@ -2,6 +2,11 @@
 게임에서 사용되는 모든 AI 프롬프트를 관리하는 모듈
 """
 
+from typing import List
+
+import orjson
+from typing_extensions import NotRequired, TypedDict
+
 # 시나리오 생성 프롬프트
 SCENARIO_GENERATION_PROMPT = """
 당신은 추리 게임의 시나리오 작가입니다. 흥미진진한 살인 사건 시나리오를 생성해주세요.
@@ -57,8 +62,9 @@ QUESTION_EVALUATION_PROMPT = """
 중요: 반드시 유효한 JSON 형식으로만 응답하세요.
 """
 
-# NPC 응답 생성 프롬프트
-NPC_RESPONSE_PROMPT = """
+# NPC 응답 생성 프롬프트 (게임 동안 변하지 않는 NPC 설정)
+# NPC별 모델의 system_instruction으로 사용되어 매 턴 다시 보내지 않습니다.
+NPC_SYSTEM_PROMPT = """
 당신은 추리 게임의 NPC '{npc_name}'입니다.
 
 사건 정보:
@@ -76,10 +82,6 @@ NPC_RESPONSE_PROMPT = """
 - 알리바이: {alibi}
 - 피해자와의 관계: {relationship}
 
-{conversation_history}
-
-수사관의 질문: "{question}"
-
 역할 연기 규칙:
 1. 당신의 성격에 맞게 대답하세요
 2. 비밀을 직접적으로 드러내지 마세요 (단, 날카로운 질문에는 힌트를 줄 수 있습니다)
@@ -87,6 +89,11 @@ NPC_RESPONSE_PROMPT = """
 4. 100자 이내로 답변하세요
 5. 방어적이거나 회피적인 태도를 보일 수 있습니다
 6. 진실과 거짓을 섞어서 답변하세요
+"""
+
+# NPC 응답 생성 프롬프트 (매 턴 바뀌는 뒷부분)
+NPC_TURN_PROMPT = """{conversation_history}
+수사관의 질문: "{question}"
 
 답변만 작성하세요 (다른 설명 없이):
 """
@@ -101,6 +108,56 @@ HINT_GENERATION_PROMPT = """
 50자 이내로 작성하세요.
 """
 
+# 힌트 묶음 생성 프롬프트 (한 번의 호출로 게임에서 사용할 힌트를 모두 생성)
+HINT_BATCH_GENERATION_PROMPT = """
+사건 정보:
+{scenario}
+범인: {culprit}
+
+플레이어에게 차례로 줄 힌트 {count}개를 작성하세요. 범인을 직접적으로 밝히지 말고, 추리의 방향을 제시하는 간접적인 힌트를 주세요.
+첫 번째 힌트는 가장 모호하게, 뒤로 갈수록 조금씩 구체적으로 작성하세요. 각 힌트는 50자 이내로 작성하세요.
+
+다음 JSON 형식으로만 응답하세요:
+{{
+    "hints": ["첫 번째 힌트", "두 번째 힌트", "..."]
+}}
+"""
+
+
+# ===== LLM 응답 스키마 =====
+
+class NpcSchema(TypedDict):
+    """시나리오 생성 응답의 NPC 항목"""
+    name: str
+    role: str
+    personality: str
+    secret: str
+    alibi: str
+    relationship: str
+
+
+class ScenarioSchema(TypedDict):
+    """시나리오 생성 응답 (SCENARIO_GENERATION_PROMPT)"""
+    title: str
+    scenario: str
+    victim: str
+    location: str
+    time: str
+    culprit: str
+    npcs: List[NpcSchema]
+    key_evidence: NotRequired[List[str]]
+
+
+class EvaluationSchema(TypedDict):
+    """질문 품질 평가 응답 (QUESTION_EVALUATION_PROMPT)"""
+    score: NotRequired[int]
+    reasoning: NotRequired[str]
+
+
+class HintBatchSchema(TypedDict):
+    """힌트 묶음 생성 응답 (HINT_BATCH_GENERATION_PROMPT)"""
+    hints: List[str]
+
 
 def format_question_evaluation_prompt(question: str, scenario_context: str) -> str:
     """질문 품질 평가 프롬프트 생성"""
@@ -110,14 +167,9 @@ def format_question_evaluation_prompt(question: str, scenario_context: str) -> s
     )
 
 
-def format_npc_response_prompt(
-    question: str,
-    npc_info: dict,
-    scenario: dict,
-    conversation_history: str = ""
-) -> str:
-    """NPC 응답 생성 프롬프트 생성"""
-    return NPC_RESPONSE_PROMPT.format(
+def format_npc_system_prompt(npc_info: dict, scenario: dict) -> str:
+    """NPC 응답 생성용 고정 프롬프트 생성 (게임당 NPC별 1회)"""
+    return NPC_SYSTEM_PROMPT.format(
         npc_name=npc_info['name'],
         title=scenario['title'],
         scenario=scenario['scenario'],
@@ -128,7 +180,13 @@ def format_npc_response_prompt(
         personality=npc_info['personality'],
         secret=npc_info['secret'],
         alibi=npc_info['alibi'],
-        relationship=npc_info['relationship'],
+        relationship=npc_info['relationship']
+    )
+
+
+def format_npc_turn_prompt(question: str, conversation_history: str = "") -> str:
+    """NPC 응답 생성용 턴별 프롬프트 생성"""
+    return NPC_TURN_PROMPT.format(
         conversation_history=conversation_history,
         question=question
     )
@@ -142,16 +200,28 @@ def format_hint_generation_prompt(scenario: str, culprit: str) -> str:
     )
 
 
-def build_conversation_history(previous_questions: list, max_items: int = 5) -> str:
-    """이전 대화 히스토리 구성"""
-    if not previous_questions:
+def format_hint_batch_generation_prompt(scenario: str, culprit: str, count: int) -> str:
+    """힌트 묶음 생성 프롬프트 생성"""
+    return HINT_BATCH_GENERATION_PROMPT.format(
+        scenario=scenario,
+        culprit=culprit,
+        count=count
+    )
+
+
+def format_history_entry(npc_name: str, question: str, answer: str) -> str:
+    """대화 히스토리 항목 생성 (질문 기록 시 1회, 어느 NPC와의 대화인지 함께 표시)"""
+    return f"Q({npc_name}): {question}\n   A: {answer}\n"
+
+
+def build_conversation_history(history_entries) -> str:
+    """이전 대화 히스토리 구성 (format_history_entry로 만든 최근 항목들에 번호를 붙여 합침)"""
+    if not history_entries:
         return ""
     
-    conversation_history = "\n이전 질문들:\n"
-    for i, q in enumerate(previous_questions[-max_items:], 1):
-        conversation_history += f"{i}. Q: {q['question']}\n   A: {q['answer']}\n"
-    
-    return conversation_history
+    return "\n이전 질문들:\n" + "".join(
+        f"{i}. {entry}" for i, entry in enumerate(history_entries, 1)
+    )
 
 
 # 기본 시나리오 (LLM 생성 실패 시 사용)
@@ -194,3 +264,6 @@ DEFAULT_SCENARIO = {
         "CCTV에 찍힌 복도의 그림자"
     ]
 }
+
+# 기본 시나리오의 JSON 문자열 (DB 저장 시 재직렬화하지 않도록 미리 생성)
+DEFAULT_SCENARIO_JSON = orjson.dumps(DEFAULT_SCENARIO).decode()
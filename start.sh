@@ -78,9 +78,12 @@ echo ""
 echo "🚀 서버를 시작합니다..."
 echo ""
 echo "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
-echo "   게임 접속: http://localhost:5000"
+echo "   게임 접속: http://localhost:${PORT:-5000}"
 echo "   종료: Ctrl+C"
 echo "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
 echo ""
 
-python app.py
+# 게임 세션이 인메모리에 있으므로 워커는 1개로 유지하고,
+# gevent로 느린 Gemini 호출을 여러 요청이 동시에 기다릴 수 있게 합니다.
+# (app.py의 Gemini 호출 풀도 WORKER_CONNECTIONS 크기를 따릅니다.)
+gunicorn -k gevent -w 1 --worker-connections ${WORKER_CONNECTIONS:-1000} -b 0.0.0.0:${PORT:-5000} app:app